@@ -5,19 +5,92 @@ Machine-friendly wrapper around the Obsidian CLI.
 
 from __future__ import annotations
 
-import argparse
-import json
+import functools
+import getopt
 import os
-import shutil
-import subprocess
 import sys
-from datetime import datetime, timezone
+import time
+import weakref
 from pathlib import Path
-from typing import Dict, List, Optional, Sequence
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    import argparse
+    import selectors
+    import subprocess
+
+_STDIO_FLAG = "--json-stdio"
+_STDIO_TIMEOUT_SECONDS = 60.0
+_STDIO_SUPPORT: Dict[str, bool] = {}
+_SESSIONS: Dict[Tuple[str, str], "_CliSession"] = {}
+
+_DESTRUCTIVE_REASONS = {
+    "delete": "delete",
+    "plugin:uninstall": "plugin-uninstall",
+    "publish:remove": "publish-remove",
+    "workspace:delete": "workspace-delete",
+}
+
+_NO_VAULT_COMMANDS = frozenset({
+    "help",
+    "version",
+    "reload",
+    "restart",
+    "vault",
+    "vaults",
+    "vault:open",
+})
+
+
+# Importing orjson costs more than stdlib json saves on small payloads, so it
+# is only loaded once a payload is large enough to pay for itself.
+_ORJSON_MIN_BYTES = 64 * 1024
+
+
+@functools.lru_cache(maxsize=1)
+def _load_orjson() -> Any:
+    try:
+        import orjson  # type: ignore
+    except Exception:
+        return None
+    return orjson
+
+
+def _orjson_for(size: int) -> Any:
+    if size < _ORJSON_MIN_BYTES:
+        return None
+    return _load_orjson()
+
+
+def _json_loads(data: str) -> object:
+    orjson = _orjson_for(len(data))
+    if orjson is not None:
+        return orjson.loads(data)
+    import json
+
+    return json.loads(data)
+
+
+def _print_json(obj: object, size_hint: int = 0) -> None:
+    # orjson emits UTF-8 bytes; write them to the binary buffer so a non-UTF-8
+    # stdout (e.g. a cp1252 pipe on Windows) cannot fail to encode them.
+    buffer = getattr(sys.stdout, "buffer", None)
+    orjson = _orjson_for(size_hint) if buffer is not None else None
+    if orjson is not None:
+        sys.stdout.flush()
+        buffer.write(orjson.dumps(obj, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE))
+        buffer.flush()
+        return
+    import json
+
+    # Stdlib output stays ASCII-escaped, which any console encoding accepts.
+    print(json.dumps(obj, indent=2, default=str))
 
 
 def utc_now_iso_z() -> str:
-    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+    seconds, micros = divmod(time.time_ns() // 1000, 1_000_000)
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds)) + f".{micros:06d}Z"
 
 
 def _default_cli_binary() -> str:
@@ -31,33 +104,17 @@ def _load_binary(override: str) -> str:
     return _default_cli_binary()
 
 
-def _to_iso_jsonable(obj: object) -> object:
-    if isinstance(obj, dict):
-        return {k: _to_iso_jsonable(v) for k, v in obj.items()}
-    if isinstance(obj, (list, tuple)):
-        return [_to_iso_jsonable(v) for v in obj]
-    return obj
+@functools.lru_cache(maxsize=16)
+def _resolve_binary(binary_path: str, path_env: str, cwd: str) -> Optional[str]:
+    # path_env and cwd are only part of the cache key: PATH changes and a chdir
+    # (which moves relative binaries like ./obsidian) invalidate the entry.
+    import shutil
+
+    return shutil.which(binary_path) or (binary_path if Path(binary_path).exists() else None)
 
 
 def _is_destructive(command: List[str], force_delete: bool) -> Optional[str]:
-    if not command:
-        return None
-    primary = command[0]
-    flags = set(command[1:])
-
-    if primary == "delete" and "permanent" in flags and not force_delete:
-        return "delete-permanent"
-    if primary == "delete" and not force_delete:
-        return "delete"
-    if primary == "plugin:uninstall" and not force_delete:
-        return "plugin-uninstall"
-    if primary == "publish:remove" and not force_delete:
-        return "publish-remove"
-    if primary == "workspace:delete" and not force_delete:
-        return "workspace-delete"
-    if primary.endswith(":delete") and primary != "task:delete" and not force_delete:
-        return f"command-{primary}"
-    return None
+    return _analyze(command, force_delete)[2]
 
 
 def _is_json_text(text: str) -> bool:
@@ -68,24 +125,27 @@ def _safe_parse_json(text: str) -> Optional[object]:
     if not _is_json_text(text):
         return None
     try:
-        return json.loads(text)
-    except json.JSONDecodeError:
+        return _json_loads(text)
+    except ValueError:
         return None
 
 
-def _parse_vaults_text(text: str) -> List[Dict[str, str]]:
-    lines = [line.strip() for line in text.splitlines() if line.strip()]
-    entries: List[Dict[str, str]] = []
-    seen = set()
-    for line in lines:
-        if line.lower().startswith("name") and "path" in line.lower():
+def _iter_vaults_from_text(text: str) -> Iterator[Tuple[str, str]]:
+    header_checked = False
+    for raw in text.split("\n"):
+        line = raw.strip()
+        if not line:
             continue
-        if "\t" in line:
-            left, right = line.split("\t", 1)
+        if not header_checked:
+            header_checked = True
+            if line[:4].lower() == "name" and "path" in line.lower():
+                continue
+        left, sep, right = line.partition("\t")
+        if sep:
             name = left.strip()
             path = right.strip()
         else:
-            pieces = [p.strip() for p in line.split(" ") if p.strip()]
+            pieces = line.split()
             if len(pieces) < 2:
                 continue
             name = pieces[0]
@@ -93,50 +153,48 @@ def _parse_vaults_text(text: str) -> List[Dict[str, str]]:
 
         if not name or not path:
             continue
-        if "/" not in path and not path.startswith(".") and not path.startswith("~"):
+        if "/" not in path and path[0] not in ".~":
             continue
-        key = (name, path)
-        if key in seen:
-            continue
-        seen.add(key)
-        entries.append({"name": name, "path": path})
-    return entries
+        yield name, path
 
 
-def _extract_vaults_from_payload(payload: object) -> List[Dict[str, str]]:
-    if payload is None:
-        return []
+def _iter_vaults_from_payload(payload: object) -> Iterator[Tuple[str, str]]:
     if isinstance(payload, list):
-        extracted: List[Dict[str, str]] = []
         for item in payload:
             if not isinstance(item, dict):
                 continue
             name = item.get("name")
             path = item.get("path")
             if isinstance(name, str) and isinstance(path, str):
-                extracted.append({"name": name, "path": path})
-        return extracted
+                yield name, path
+        return
 
     if isinstance(payload, dict):
-        extracted: List[Dict[str, str]] = []
-        candidates = [payload]
+        candidates: Iterable[object] = [payload]
         nested = payload.get("vaults")
         if isinstance(nested, list):
             candidates = nested
         elif isinstance(nested, dict):
-            candidates = list(nested.values())
-        if not isinstance(nested, (list, dict)) and "name" in payload and "path" in payload:
-            # direct object with top-level name/path
-            candidates = [payload]
+            candidates = nested.values()
         for item in candidates:
             if not isinstance(item, dict):
                 continue
             name = item.get("name") or item.get("label")
             path = item.get("path")
             if isinstance(name, str) and isinstance(path, str):
-                extracted.append({"name": name, "path": path})
-        return extracted
-    return []
+                yield name, path
+
+
+def _collect_vaults(pairs: Iterable[Tuple[str, str]]) -> List[Dict[str, str]]:
+    seen = set()
+    entries: List[Dict[str, str]] = []
+    for name, path in pairs:
+        key = (name, path)
+        if key in seen:
+            continue
+        seen.add(key)
+        entries.append({"name": name, "path": path})
+    return entries
 
 
 def discover_vaults(binary: str) -> List[Dict[str, str]]:
@@ -151,23 +209,219 @@ def discover_vaults(binary: str) -> List[Dict[str, str]]:
 
     payload = result.get("parsed")
     if payload is not None:
-        entries = _extract_vaults_from_payload(payload)
+        entries = _collect_vaults(_iter_vaults_from_payload(payload))
         if entries:
             return entries
 
-    return _parse_vaults_text(result.get("stdout", ""))
+    return _collect_vaults(_iter_vaults_from_text(str(result.get("stdout", ""))))
+
+
+def _stdio_enabled() -> bool:
+    # Session reads wait on the pipe with selectors, which Windows only supports for sockets.
+    if sys.platform.startswith("win"):
+        return False
+    return os.environ.get("OBSIDIAN_CLI_STDIO", "").strip() not in {"", "0"}
+
+
+def _supports_stdio(resolved_binary: str) -> bool:
+    import subprocess
+
+    cached = _STDIO_SUPPORT.get(resolved_binary)
+    if cached is None:
+        try:
+            probe = subprocess.run(
+                [resolved_binary, "--help"],
+                capture_output=True,
+                check=False,
+                text=True,
+                encoding="utf-8",
+                errors="replace",
+                timeout=10,
+            )
+            cached = _STDIO_FLAG in (probe.stdout or "") + (probe.stderr or "")
+        except (OSError, subprocess.SubprocessError):
+            cached = False
+        _STDIO_SUPPORT[resolved_binary] = cached
+    return cached
+
+
+def _close_session(proc: subprocess.Popen, selector: selectors.BaseSelector) -> None:
+    import subprocess
+
+    selector.close()
+    # Close both pipes even when the worker already exited, or their fds leak.
+    for stream in (proc.stdin, proc.stdout):
+        if stream is None:
+            continue
+        try:
+            stream.close()
+        except OSError:
+            pass
+    if proc.poll() is not None:
+        return
+    try:
+        proc.wait(timeout=2)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
+class _CliSession:
+    """
+    Long-lived CLI process speaking line-delimited JSON over stdin/stdout.
+
+    Requests are framed as {"id": n, "argv": [...]}; the CLI answers with
+    {"id": n, "exit_code": int, "stdout": str, "stderr": str}.
+    """
+
+    def __init__(self, resolved_binary: str) -> None:
+        import selectors
+        import subprocess
+
+        self._proc = subprocess.Popen(
+            [resolved_binary, _STDIO_FLAG],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        self._next_id = 0
+        # Responses are read straight from the pipe fd so a stalled worker can time out.
+        self._buffer = bytearray()
+        self._selector = selectors.DefaultSelector()
+        self._finalizer = weakref.finalize(self, _close_session, self._proc, self._selector)
+        if self._proc.stdout is not None:
+            self._selector.register(self._proc.stdout, selectors.EVENT_READ)
+
+    @property
+    def alive(self) -> bool:
+        return self._proc.poll() is None
+
+    def send(self, command_list: List[str]) -> Optional[Dict[str, object]]:
+        self._next_id += 1
+        request_id = self._next_id
+        frame = {"id": request_id, "argv": command_list}
+        import json
+
+        encoded = (json.dumps(frame) + "\n").encode("utf-8")
+        stdin = self._proc.stdin
+        stdout = self._proc.stdout
+        if stdin is None or stdout is None:
+            return None
+        deadline = time.monotonic() + _STDIO_TIMEOUT_SECONDS
+        try:
+            stdin.write(encoded)
+            stdin.flush()
+            while True:
+                line = self._read_line(stdout.fileno(), deadline)
+                if line is None:
+                    return None
+                response = _safe_parse_json(line.decode("utf-8", errors="replace").strip())
+                if isinstance(response, dict) and response.get("id") == request_id:
+                    return response
+        except OSError:
+            return None
+
+    def _read_line(self, fd: int, deadline: float) -> Optional[bytes]:
+        while True:
+            newline = self._buffer.find(b"\n")
+            if newline >= 0:
+                line = bytes(self._buffer[: newline + 1])
+                del self._buffer[: newline + 1]
+                return line
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self._selector.select(remaining):
+                return None
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                return None
+            self._buffer += chunk
+
+    def close(self) -> None:
+        self._finalizer()
+
+
+def _get_session(resolved_binary: str, vault: str) -> Optional[_CliSession]:
+    key = (resolved_binary, vault)
+    session = _SESSIONS.get(key)
+    if session is not None and session.alive:
+        return session
+    try:
+        session = _CliSession(resolved_binary)
+    except OSError:
+        _SESSIONS.pop(key, None)
+        return None
+    _SESSIONS[key] = session
+    return session
+
+
+def _run_command(resolved_binary: str, vault: str, command_list: List[str]) -> Tuple[int, str, str]:
+    if _stdio_enabled() and _supports_stdio(resolved_binary):
+        session = _get_session(resolved_binary, vault)
+        if session is not None:
+            response = session.send(command_list)
+            if response is None:
+                # The command may already have run; report instead of replaying it.
+                session.close()
+                _SESSIONS.pop((resolved_binary, vault), None)
+                return 1, "", "Obsidian CLI session terminated or timed out."
+            exit_code = response.get("exit_code")
+            stdout = response.get("stdout")
+            stderr = response.get("stderr")
+            return (
+                exit_code if isinstance(exit_code, int) else 1,
+                stdout if isinstance(stdout, str) else "",
+                stderr if isinstance(stderr, str) else "",
+            )
+
+    import subprocess
+
+    try:
+        completed = subprocess.run(
+            [resolved_binary, *command_list],
+            capture_output=True,
+            check=False,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+        )
+    except OSError as exc:
+        # The cached resolution may be stale (binary removed or made non-executable).
+        _resolve_binary.cache_clear()
+        return 1, "", f"Failed to run Obsidian CLI {resolved_binary}: {exc}"
+    return completed.returncode, completed.stdout or "", completed.stderr or ""
 
 
 def _command_needs_vault(command: Sequence[str]) -> bool:
-    return bool(command) and command[0] not in {
-        "help",
-        "version",
-        "reload",
-        "restart",
-        "vault",
-        "vaults",
-        "vault:open",
-    }
+    return _analyze(command, force_delete=True)[0]
+
+
+def _analyze(command: Sequence[str], force_delete: bool) -> Tuple[bool, bool, Optional[str]]:
+    """
+    Scan a command once and return (needs_vault, has_vault_arg, destructive_reason).
+
+    The primary command is the first token that is not a vault= selector, so
+    an explicit or injected vault prefix cannot hide a destructive command.
+    """
+    primary = ""
+    has_vault_arg = False
+    has_permanent = False
+    for part in command:
+        if part[:6] == "vault=":
+            has_vault_arg = True
+        elif not primary:
+            primary = part
+        elif part == "permanent":
+            has_permanent = True
+
+    needs_vault = bool(primary) and primary not in _NO_VAULT_COMMANDS
+    reason: Optional[str] = None
+    if primary and not force_delete:
+        reason = _DESTRUCTIVE_REASONS.get(primary)
+        if reason == "delete" and has_permanent:
+            reason = "delete-permanent"
+        elif reason is None and primary.endswith(":delete") and primary != "task:delete":
+            reason = f"command-{primary}"
+    return needs_vault, has_vault_arg, reason
 
 
 def run_obsidian(
@@ -194,7 +448,7 @@ def run_obsidian(
         }
 
     binary_path = _load_binary(binary)
-    resolved_binary = shutil.which(binary_path) or (binary_path if Path(binary_path).exists() else None)
+    resolved_binary = _resolve_binary(binary_path, os.environ.get("PATH", ""), os.getcwd())
     if not resolved_binary:
         return {
             "ok": False,
@@ -209,14 +463,14 @@ def run_obsidian(
             "ts": utc_now_iso_z(),
         }
 
-    if _command_needs_vault(command_list):
+    needs_vault, has_vault_arg, blocked_reason = _analyze(command_list, force_delete)
+    if needs_vault:
         if vault:
-            if not any(part.startswith("vault=") for part in command_list):
+            if not has_vault_arg:
                 command_list = [f"vault={vault}"] + command_list
-        elif any(part.startswith("vault=") for part in command_list):
+        elif has_vault_arg:
             vault = ""
 
-    blocked_reason = _is_destructive(command_list, force_delete=force_delete)
     if blocked_reason:
         return {
             "ok": False,
@@ -231,23 +485,13 @@ def run_obsidian(
             "ts": utc_now_iso_z(),
         }
 
-    completed = subprocess.run(
-        [resolved_binary, *command_list],
-        capture_output=True,
-        check=False,
-        text=True,
-        encoding="utf-8",
-        errors="replace",
-    )
-
-    stdout = completed.stdout or ""
-    stderr = completed.stderr or ""
+    exit_code, stdout, stderr = _run_command(resolved_binary, vault, command_list)
     parsed = _safe_parse_json(stdout) if parse_output else None
 
     payload = {
-        "ok": completed.returncode == 0,
+        "ok": exit_code == 0,
         "command": command_list,
-        "exit_code": completed.returncode,
+        "exit_code": exit_code,
         "stdout": stdout,
         "stderr": stderr,
         "parsed": parsed,
@@ -258,13 +502,13 @@ def run_obsidian(
     }
     if parse_output and parsed is None and not stdout.strip():
         payload["output_stderr_only"] = bool(stderr.strip())
-    return _to_iso_jsonable(payload)
+    return payload
 
 
 def cmd_exec(args: argparse.Namespace) -> int:
     command = list(args.command) if isinstance(args.command, list) else []
     if not command:
-        print(json.dumps({"ok": False, "stderr": "No command provided."}, indent=2))
+        _print_json({"ok": False, "stderr": "No command provided."})
         return 1
 
     result = run_obsidian(
@@ -282,23 +526,66 @@ def cmd_exec(args: argparse.Namespace) -> int:
             print(result["stderr"], file=sys.stderr)
         return int(0 if result.get("ok") else 1)
 
-    print(json.dumps(result, indent=2, default=str))
+    _print_json(result, size_hint=len(result.get("stdout") or ""))
     return int(0 if result.get("ok") else 1)
 
 
+# Single option spec shared by build_parser() and the getopt fast path.
+# Each option is (name, default, help); a bool default marks a store_true flag.
+_OPTIONS = (
+    ("binary", "", "Override Obsidian CLI binary/path"),
+    ("vault", "", "Target vault name"),
+    ("raw", False, "Passthrough raw stdout/stderr instead of JSON envelope"),
+    ("force-delete", False, "Allow destructive commands"),
+)
+
+
 def build_parser() -> argparse.ArgumentParser:
+    import argparse
+
     parser = argparse.ArgumentParser(description="Run Obsidian CLI command through a machine-first adapter.")
-    parser.add_argument("--binary", default="", help="Override Obsidian CLI binary/path")
-    parser.add_argument("--vault", default="", help="Target vault name")
-    parser.add_argument("--raw", action="store_true", help="Passthrough raw stdout/stderr instead of JSON envelope")
-    parser.add_argument("--force-delete", action="store_true", help="Allow destructive commands")
+    for name, default, help_text in _OPTIONS:
+        if isinstance(default, bool):
+            parser.add_argument(f"--{name}", action="store_true", help=help_text)
+        else:
+            parser.add_argument(f"--{name}", default=default, help=help_text)
 
     parser.add_argument("command", nargs=argparse.REMAINDER, help="Obsidian CLI command and args")
     parser.set_defaults(func=cmd_exec)
     return parser
 
 
+def _fast_parse_args(argv: List[str]) -> Optional[SimpleNamespace]:
+    """
+    Parse well-formed invocations without building the argparse tree.
+
+    Returns None for help requests, errors, and empty commands so
+    build_parser() handles them with its usual messages.
+    """
+    if "-h" in argv or "--help" in argv:
+        return None
+    table = {name: (name.replace("-", "_"), default) for name, default, _ in _OPTIONS}
+    longopts = [name if isinstance(default, bool) else f"{name}=" for name, (_, default) in table.items()]
+    try:
+        opts, command = getopt.getopt(argv, "", longopts)
+    except getopt.GetoptError:
+        return None
+    if not command:
+        return None
+    # getopt accepts "--vault --raw" where argparse rejects the option-like value.
+    if any(value[:1] == "-" for _, value in opts):
+        return None
+    values: Dict[str, object] = {dest: default for dest, default in table.values()}
+    for opt, value in opts:
+        dest, default = table[opt[2:]]
+        values[dest] = True if isinstance(default, bool) else value
+    return SimpleNamespace(command=command, func=cmd_exec, **values)
+
+
 def main() -> int:
+    fast_args = _fast_parse_args(sys.argv[1:])
+    if fast_args is not None:
+        return fast_args.func(fast_args)
     parser = build_parser()
     args = parser.parse_args()
     if args.command and args.command[0] == "--":
@@ -3,22 +3,54 @@
 Manage a local registry of Obsidian vault paths.
 """
 
-import argparse
-import json
+from __future__ import annotations
+
+import getopt
+import itertools
 import os
+import stat
 import sys
-from datetime import datetime, timezone
+import time
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Tuple
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+if TYPE_CHECKING:
+    import argparse
 
 try:
     import obsidian_cli  # type: ignore
 except Exception:
     obsidian_cli = None
 
+_FRONT_MATTER_MAX_LINES = 64
+
+# path -> (st_mtime_ns, st_size, raw registry bytes)
+_REG_CACHE: Dict[Path, Tuple[int, int, bytes]] = {}
+
+
+# Registry and Obsidian config files are a few KB at most; stdlib json handles
+# them faster than importing orjson would, so it is deliberately not used here.
+def _json_loads(data: bytes) -> object:
+    import json
+
+    return json.loads(data)
+
+
+def _print_json(obj: object) -> None:
+    import json
+
+    # ASCII-escaped output, which any console encoding accepts.
+    print(json.dumps(obj, indent=2, default=str))
+
 
 def utc_now_iso_z() -> str:
-    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+    seconds, micros = divmod(time.time_ns() // 1000, 1_000_000)
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds)) + f".{micros:06d}Z"
+
+
+def _fast_resolve(raw: Union[str, "os.PathLike[str]"]) -> Path:
+    return Path(os.path.realpath(os.path.expanduser(raw)))
 
 
 def normalize_workdir(raw: str) -> str:
@@ -40,19 +72,18 @@ def resolve_workdir_abs(vault_root: Path, workdir: str) -> Path:
 
 def parse_skill_name_from_skill_md(skill_root: Path) -> Optional[str]:
     skill_md = skill_root / "SKILL.md"
-    if not skill_md.exists():
-        return None
     try:
-        lines = skill_md.read_text().splitlines()
+        with skill_md.open(encoding="utf-8", errors="replace") as handle:
+            if handle.readline().strip() != "---":
+                return None
+            # Only the front matter is needed; stop at its closing marker.
+            for line in itertools.islice(handle, _FRONT_MATTER_MAX_LINES):
+                if line.strip() == "---":
+                    break
+                if line.startswith("name:"):
+                    return line.split(":", 1)[1].strip()
     except OSError:
         return None
-    if not lines or lines[0].strip() != "---":
-        return None
-    for line in lines[1:]:
-        if line.strip() == "---":
-            break
-        if line.startswith("name:"):
-            return line.split(":", 1)[1].strip()
     return None
 
 
@@ -67,7 +98,7 @@ def resolve_skill_name(skill_root: Path, override: Optional[str]) -> str:
 
 def guess_project_root(skill_root: Path, override: Optional[str]) -> Path:
     if override:
-        return Path(override).expanduser().resolve()
+        return _fast_resolve(override)
     resolved = skill_root.resolve()
     if resolved.parent.name == "skills" and len(resolved.parents) >= 3:
         return resolved.parents[2]
@@ -81,22 +112,14 @@ def registry_path(
     project_root: Optional[str],
 ) -> Path:
     if data_root:
-        data_root_path = Path(data_root).expanduser().resolve()
+        data_root_path = _fast_resolve(data_root)
     else:
         project_root_path = guess_project_root(skill_root, project_root)
         data_root_path = project_root_path / ".skills-data"
     return data_root_path / skill_name / "vaults.json"
 
 
-def load_registry(path: Path) -> Dict[str, object]:
-    if not path.exists():
-        return {"schema_version": 1, "vaults": {}, "active": ""}
-    try:
-        data = json.loads(path.read_text())
-    except (OSError, json.JSONDecodeError):
-        return {"schema_version": 1, "vaults": {}, "active": ""}
-    if not isinstance(data, dict):
-        return {"schema_version": 1, "vaults": {}, "active": ""}
+def _normalize_registry(data: Dict[str, object]) -> Dict[str, object]:
     data.setdefault("schema_version", 1)
     data.setdefault("vaults", {})
     data.setdefault("active", "")
@@ -107,14 +130,76 @@ def load_registry(path: Path) -> Dict[str, object]:
     return data
 
 
+def load_registry(path: Path) -> Dict[str, object]:
+    try:
+        st = path.stat()
+    except OSError:
+        return {"schema_version": 1, "vaults": {}, "active": ""}
+    # Re-parsing cached bytes hands every caller a fresh dict and is cheaper than a deepcopy.
+    cached = _REG_CACHE.get(path)
+    if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        raw = cached[2]
+    else:
+        try:
+            raw = path.read_bytes()
+        except OSError:
+            return {"schema_version": 1, "vaults": {}, "active": ""}
+        _REG_CACHE[path] = (st.st_mtime_ns, st.st_size, raw)
+    try:
+        data = _json_loads(raw)
+    except ValueError:
+        return {"schema_version": 1, "vaults": {}, "active": ""}
+    if not isinstance(data, dict):
+        return {"schema_version": 1, "vaults": {}, "active": ""}
+    return _normalize_registry(data)
+
+
+def _current_umask() -> int:
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
 def save_registry(path: Path, data: Dict[str, object]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(data, indent=2) + "\n")
+    import json
+
+    encoded = (json.dumps(data, indent=2) + "\n").encode("utf-8")
+    import tempfile
+
+    # Replace the symlink target, not the link itself, so a linked registry stays linked.
+    target = Path(os.path.realpath(path))
+    # mkstemp creates the file 0600; keep the registry's existing mode, or what
+    # a plain open() would give a new file under the current umask.
+    try:
+        mode = stat.S_IMODE(target.stat().st_mode)
+    except OSError:
+        mode = 0o666 & ~_current_umask()
+    fd, tmp_name = tempfile.mkstemp(dir=target.parent, prefix=target.name + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            if hasattr(os, "fchmod"):
+                os.fchmod(handle.fileno(), mode)
+            handle.write(encoded)
+            handle.flush()
+            st = os.fstat(handle.fileno())
+        os.replace(tmp_name, target)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+    _REG_CACHE[path] = (st.st_mtime_ns, st.st_size, encoded)
 
 
 def is_vault_root(path: Path) -> bool:
-    obsidian_dir = path / ".obsidian"
-    return path.exists() and path.is_dir() and obsidian_dir.exists()
+    # A .obsidian directory implies the parent exists and is a directory.
+    try:
+        st = os.stat(os.path.join(os.fspath(path), ".obsidian"))
+    except OSError:
+        return False
+    return stat.S_ISDIR(st.st_mode)
 
 
 def candidate_config_dirs() -> List[Path]:
@@ -140,8 +225,16 @@ def candidate_config_files(explicit: Optional[str]) -> List[Path]:
         return [Path(explicit).expanduser()]
     files: List[Path] = []
     for base in candidate_config_dirs():
-        files.append(base / "vaults.json")
-        files.append(base / "obsidian.json")
+        # One directory listing per base instead of a stat per candidate name.
+        try:
+            with os.scandir(base) as it:
+                entries = {entry.name: entry for entry in it}
+        except OSError:
+            continue
+        for name in ("vaults.json", "obsidian.json"):
+            entry = entries.get(name)
+            if entry is not None and entry.is_file():
+                files.append(Path(entry.path))
     return files
 
 
@@ -179,21 +272,20 @@ def discover_vaults_from_config(config_path: Optional[str]) -> List[Dict[str, st
     results: List[Dict[str, str]] = []
     seen_paths = set()
     for path in candidate_config_files(config_path):
-        if not path.exists():
-            continue
         try:
-            data = json.loads(path.read_text())
-        except (OSError, json.JSONDecodeError):
+            data = _json_loads(path.read_bytes())
+        except (OSError, ValueError):
             continue
+        source = str(path)
         for name, vault_path in extract_vault_entries(data):
-            resolved = str(Path(vault_path).expanduser())
+            resolved = os.path.expanduser(vault_path)
             if resolved in seen_paths:
                 continue
             seen_paths.add(resolved)
             results.append({
                 "name": name,
                 "path": resolved,
-                "source": str(path),
+                "source": source,
             })
     return results
 
@@ -220,16 +312,46 @@ def discover_vaults(config_path: Optional[str], cli_binary: str = "") -> List[Di
     return discover_vaults_from_config(config_path)
 
 
-def cmd_list(args: argparse.Namespace) -> int:
-    skill_root = Path(args.skill_root).expanduser().resolve()
-    skill_name = resolve_skill_name(skill_root, args.skill_name or None)
-    reg_path = registry_path(skill_root, skill_name, args.data_root, args.project_root)
-    registry = load_registry(reg_path)
-    vaults = registry.get("vaults", {})
-    active = registry.get("active", "") if isinstance(registry, dict) else ""
+class RegistryContext:
+    """
+    Resolved skill paths plus the loaded registry.
+
+    The cmd_* handlers build one from their args unless a caller passes an
+    existing context, which lets a long-running driver reuse it across commands.
+    """
+
+    __slots__ = ("skill_root", "skill_name", "reg_path", "registry")
+
+    def __init__(
+        self,
+        skill_root: Path,
+        skill_name: str,
+        reg_path: Path,
+        registry: Dict[str, object],
+    ) -> None:
+        self.skill_root = skill_root
+        self.skill_name = skill_name
+        self.reg_path = reg_path
+        self.registry = registry
+
+    @classmethod
+    def from_args(cls, args: argparse.Namespace) -> RegistryContext:
+        skill_root = _fast_resolve(args.skill_root)
+        skill_name = resolve_skill_name(skill_root, args.skill_name or None)
+        reg_path = registry_path(skill_root, skill_name, args.data_root, args.project_root)
+        return cls(skill_root, skill_name, reg_path, load_registry(reg_path))
+
+    def save(self) -> None:
+        save_registry(self.reg_path, self.registry)
+
+
+def cmd_list(args: argparse.Namespace, ctx: Optional[RegistryContext] = None) -> int:
+    ctx = ctx or RegistryContext.from_args(args)
+    vaults = ctx.registry.get("vaults", {})
+    active = ctx.registry.get("active", "") if isinstance(ctx.registry, dict) else ""
 
     if args.json:
-        print(json.dumps({"active": active, "vaults": vaults}, indent=2))
+        _print_json({"active": active, "vaults": vaults})
         return 0
 
     if not vaults:
@@ -246,14 +368,11 @@ def cmd_list(args: argparse.Namespace) -> int:
     return 0
 
 
-def cmd_add(args: argparse.Namespace) -> int:
-    skill_root = Path(args.skill_root).expanduser().resolve()
-    skill_name = resolve_skill_name(skill_root, args.skill_name or None)
-    reg_path = registry_path(skill_root, skill_name, args.data_root, args.project_root)
-    registry = load_registry(reg_path)
-    vaults = registry.get("vaults", {})
+def cmd_add(args: argparse.Namespace, ctx: Optional[RegistryContext] = None) -> int:
+    ctx = ctx or RegistryContext.from_args(args)
+    vaults = ctx.registry.get("vaults", {})
 
-    vault_path = Path(args.path).expanduser().resolve()
+    vault_path = _fast_resolve(args.path)
     if not args.allow_missing and not is_vault_root(vault_path):
         print(f"Not a vault root (missing .obsidian): {vault_path}", file=sys.stderr)
         return 1
@@ -284,41 +403,35 @@ def cmd_add(args: argparse.Namespace) -> int:
         "source": args.source or "manual",
         "updated_at": utc_now_iso_z(),
     }
-    registry["vaults"] = vaults
+    ctx.registry["vaults"] = vaults
     if args.set_active:
-        registry["active"] = name
-    save_registry(reg_path, registry)
+        ctx.registry["active"] = name
+    ctx.save()
     print(f"Registered {name} -> {vault_path}")
     return 0
 
 
-def cmd_remove(args: argparse.Namespace) -> int:
-    skill_root = Path(args.skill_root).expanduser().resolve()
-    skill_name = resolve_skill_name(skill_root, args.skill_name or None)
-    reg_path = registry_path(skill_root, skill_name, args.data_root, args.project_root)
-    registry = load_registry(reg_path)
-    vaults = registry.get("vaults", {})
+def cmd_remove(args: argparse.Namespace, ctx: Optional[RegistryContext] = None) -> int:
+    ctx = ctx or RegistryContext.from_args(args)
+    vaults = ctx.registry.get("vaults", {})
 
     if args.name not in vaults:
         print(f"Unknown vault name: {args.name}", file=sys.stderr)
         return 1
 
     vaults.pop(args.name)
-    registry["vaults"] = vaults
-    if registry.get("active") == args.name:
-        registry["active"] = ""
-    save_registry(reg_path, registry)
+    ctx.registry["vaults"] = vaults
+    if ctx.registry.get("active") == args.name:
+        ctx.registry["active"] = ""
+    ctx.save()
     print(f"Removed {args.name}")
     return 0
 
 
-def cmd_active(args: argparse.Namespace) -> int:
-    skill_root = Path(args.skill_root).expanduser().resolve()
-    skill_name = resolve_skill_name(skill_root, args.skill_name or None)
-    reg_path = registry_path(skill_root, skill_name, args.data_root, args.project_root)
-    registry = load_registry(reg_path)
-    vaults = registry.get("vaults", {})
-    active = registry.get("active", "")
+def cmd_active(args: argparse.Namespace, ctx: Optional[RegistryContext] = None) -> int:
+    ctx = ctx or RegistryContext.from_args(args)
+    vaults = ctx.registry.get("vaults", {})
+    active = ctx.registry.get("active", "")
 
     payload = {}
     if isinstance(active, str) and active and isinstance(vaults, dict):
@@ -339,7 +452,7 @@ def cmd_active(args: argparse.Namespace) -> int:
         }
 
     if args.json:
-        print(json.dumps(payload, indent=2))
+        _print_json(payload)
         return 0
 
     if not payload:
@@ -350,31 +463,25 @@ def cmd_active(args: argparse.Namespace) -> int:
     return 0
 
 
-def cmd_set_active(args: argparse.Namespace) -> int:
-    skill_root = Path(args.skill_root).expanduser().resolve()
-    skill_name = resolve_skill_name(skill_root, args.skill_name or None)
-    reg_path = registry_path(skill_root, skill_name, args.data_root, args.project_root)
-    registry = load_registry(reg_path)
-    vaults = registry.get("vaults", {})
+def cmd_set_active(args: argparse.Namespace, ctx: Optional[RegistryContext] = None) -> int:
+    ctx = ctx or RegistryContext.from_args(args)
+    vaults = ctx.registry.get("vaults", {})
 
     if args.name not in vaults:
         print(f"Unknown vault name: {args.name}", file=sys.stderr)
         return 1
 
-    registry["active"] = args.name
-    save_registry(reg_path, registry)
+    ctx.registry["active"] = args.name
+    ctx.save()
     print(f"Active vault set to {args.name}")
     return 0
 
 
-def cmd_set_workdir(args: argparse.Namespace) -> int:
-    skill_root = Path(args.skill_root).expanduser().resolve()
-    skill_name = resolve_skill_name(skill_root, args.skill_name or None)
-    reg_path = registry_path(skill_root, skill_name, args.data_root, args.project_root)
-    registry = load_registry(reg_path)
-    vaults = registry.get("vaults", {})
+def cmd_set_workdir(args: argparse.Namespace, ctx: Optional[RegistryContext] = None) -> int:
+    ctx = ctx or RegistryContext.from_args(args)
+    vaults = ctx.registry.get("vaults", {})
 
-    name = args.name or registry.get("active", "")
+    name = args.name or ctx.registry.get("active", "")
     if not isinstance(name, str) or not name:
         print("No vault specified and no active vault set.", file=sys.stderr)
         return 1
@@ -397,7 +504,7 @@ def cmd_set_workdir(args: argparse.Namespace) -> int:
         print(f"Invalid --workdir: {exc}", file=sys.stderr)
         return 1
 
-    vault_path = Path(vault_path_str).expanduser().resolve()
+    vault_path = _fast_resolve(vault_path_str)
     workdir_abs = resolve_workdir_abs(vault_path, workdir)
     if workdir and not workdir_abs.exists() and not args.allow_missing_workdir:
         print(f"Working dir does not exist: {workdir_abs}", file=sys.stderr)
@@ -409,51 +516,54 @@ def cmd_set_workdir(args: argparse.Namespace) -> int:
     info["workdir"] = workdir
     info["updated_at"] = utc_now_iso_z()
     vaults[name] = info
-    registry["vaults"] = vaults
-    save_registry(reg_path, registry)
+    ctx.registry["vaults"] = vaults
+    ctx.save()
 
     rendered = workdir or "."
     print(f"Working dir set for {name}: {rendered}")
     return 0
 
 
-def cmd_discover(args: argparse.Namespace) -> int:
-    skill_root = Path(args.skill_root).expanduser().resolve()
-    skill_name = resolve_skill_name(skill_root, args.skill_name or None)
-    reg_path = registry_path(skill_root, skill_name, args.data_root, args.project_root)
-    registry = load_registry(reg_path)
-    vaults = registry.get("vaults", {})
+def cmd_discover(args: argparse.Namespace, ctx: Optional[RegistryContext] = None) -> int:
+    ctx = ctx or RegistryContext.from_args(args)
+    vaults = ctx.registry.get("vaults", {})
 
     found = discover_vaults(args.config, args.cli_binary)
     if args.json and not args.merge:
-        print(json.dumps(found, indent=2))
+        _print_json(found)
         return 0
 
     if args.merge:
+        # A merge is one logical update, so every touched entry shares a timestamp.
+        now = utc_now_iso_z()
+        force = args.force
         for entry in found:
             name = entry.get("name")
             path = entry.get("path")
             if not name or not path:
                 continue
-            if name in vaults and not args.force:
-                existing = vaults[name]
+            existing = vaults.get(name)
+            if name in vaults and not force:
                 existing_path = existing.get("path") if isinstance(existing, dict) else None
                 if existing_path != path:
                     print(f"Skip {name}; already registered", file=sys.stderr)
                 continue
 
-            existing_workdir = ""
-            if name in vaults and isinstance(vaults[name], dict):
-                existing_workdir = str(vaults[name].get("workdir", "") or "")
-
-            vaults[name] = {
-                "path": path,
-                "workdir": existing_workdir,
-                "source": entry.get("source", "obsidian"),
-                "updated_at": utc_now_iso_z(),
-            }
-        registry["vaults"] = vaults
-        save_registry(reg_path, registry)
+            source = entry.get("source", "obsidian")
+            if isinstance(existing, dict):
+                existing["path"] = path
+                existing["workdir"] = str(existing.get("workdir", "") or "")
+                existing["source"] = source
+                existing["updated_at"] = now
+            else:
+                vaults[name] = {
+                    "path": path,
+                    "workdir": "",
+                    "source": source,
+                    "updated_at": now,
+                }
+        ctx.registry["vaults"] = vaults
+        ctx.save()
         print(f"Merged {len(found)} vault(s)")
         return 0
 
@@ -503,7 +613,7 @@ def cmd_obsidian(args: argparse.Namespace) -> int:
         print("No command provided for obsidian execution.", file=sys.stderr)
         return 1
 
-    skill_root = Path(args.skill_root).expanduser().resolve()
+    skill_root = _fast_resolve(args.skill_root)
     skill_name = resolve_skill_name(skill_root, args.skill_name or None)
     selected_vault = args.vault or _get_active_name_and_path(
         skill_root,
@@ -527,93 +637,163 @@ def cmd_obsidian(args: argparse.Namespace) -> int:
             print(result["stderr"], file=sys.stderr)
         return int(0 if result.get("ok") else 1)
 
-    print(json.dumps(result, indent=2, default=str))
+    _print_json(result)
     return int(0 if result.get("ok") else 1)
 
 
+_DEFAULT_SKILL_ROOT = Path(__file__).resolve().parents[1]
+
+# Single option spec shared by build_parser() and the getopt fast path.
+# Each option is (name, default, help): a bool default marks a store_true flag
+# and a None default marks a required option.
+_GLOBAL_OPTIONS = (
+    ("skill-root", _DEFAULT_SKILL_ROOT, "Path to the skill root"),
+    ("skill-name", "", "Override skill name"),
+    ("data-root", "", "Override data root"),
+    ("project-root", "", "Override project root"),
+)
+
+# subcommand -> (handler, help, options, help for trailing command tokens or None)
+_SUBCOMMANDS = {
+    "list": (cmd_list, "List registered vaults", (("json", False, "Output JSON"),), None),
+    "add": (
+        cmd_add,
+        "Add a vault to the registry",
+        (
+            ("name", "", "Vault name"),
+            ("path", None, "Vault path"),
+            ("workdir", "", "Default working folder within the vault (relative path; empty for vault root)"),
+            ("allow-missing-workdir", False, "Allow setting workdir even if the folder does not exist"),
+            ("source", "", "Source label"),
+            ("force", False, "Overwrite existing name"),
+            ("allow-missing", False, "Skip .obsidian check"),
+            ("set-active", False, "Set this vault as active"),
+        ),
+        None,
+    ),
+    "remove": (cmd_remove, "Remove a vault from the registry", (("name", None, "Vault name"),), None),
+    "active": (cmd_active, "Show active vault", (("json", False, "Output JSON"),), None),
+    "set-active": (cmd_set_active, "Set active vault", (("name", None, "Vault name"),), None),
+    "set-workdir": (
+        cmd_set_workdir,
+        "Set default working folder for a vault (defaults to active)",
+        (
+            ("name", "", "Vault name (defaults to active)"),
+            ("workdir", "", "Working folder within the vault (relative path; empty for vault root)"),
+            ("allow-missing-workdir", False, "Allow setting workdir even if the folder does not exist"),
+        ),
+        None,
+    ),
+    "discover": (
+        cmd_discover,
+        "Discover vaults (Obsidian CLI first)",
+        (
+            ("config", "", "Explicit config file path"),
+            ("merge", False, "Merge into registry"),
+            ("force", False, "Overwrite existing names"),
+            ("json", False, "Output JSON when not merging"),
+            ("cli-binary", "", "Obsidian CLI binary/path"),
+        ),
+        None,
+    ),
+    "obsidian": (
+        cmd_obsidian,
+        "Run Obsidian CLI commands",
+        (
+            ("cli-binary", "", "Obsidian CLI binary/path"),
+            ("vault", "", "Target vault name"),
+            ("raw", False, "Output raw command output"),
+            ("force-delete", False, "Allow destructive commands"),
+        ),
+        "Raw obsidian command tokens",
+    ),
+}
+
+
+def _option_table(options: Sequence[Tuple[str, object, str]]) -> Dict[str, Tuple[str, object]]:
+    return {name: (name.replace("-", "_"), default) for name, default, _ in options}
+
+
+def _getopt_longopts(table: Dict[str, Tuple[str, object]]) -> List[str]:
+    return [name if isinstance(default, bool) else f"{name}=" for name, (_, default) in table.items()]
+
+
+def _fast_parse_args(argv: List[str]) -> Optional[SimpleNamespace]:
+    """
+    Parse well-formed invocations without building the argparse tree.
+
+    Returns None for help requests, errors, and anything unrecognized so
+    build_parser() handles them with its usual messages.
+    """
+    if "-h" in argv or "--help" in argv:
+        return None
+    global_table = _option_table(_GLOBAL_OPTIONS)
+    try:
+        global_opts, rest = getopt.getopt(argv, "", _getopt_longopts(global_table))
+    except getopt.GetoptError:
+        return None
+    if not rest or rest[0] not in _SUBCOMMANDS:
+        return None
+
+    handler, _, options, command_help = _SUBCOMMANDS[rest[0]]
+    takes_command = command_help is not None
+    table = _option_table(options)
+    getopt_fn = getopt.getopt if takes_command else getopt.gnu_getopt
+    try:
+        command_opts, positionals = getopt_fn(rest[1:], "", _getopt_longopts(table))
+    except getopt.GetoptError:
+        return None
+    if positionals and not takes_command:
+        return None
+    # getopt accepts "--name -x" where argparse rejects the option-like value.
+    if any(value[:1] == "-" for _, value in (*global_opts, *command_opts)):
+        return None
+
+    values: Dict[str, object] = {dest: default for dest, default in global_table.values()}
+    values.update(table.values())
+    values["command"] = positionals if takes_command else rest[0]
+    values["func"] = handler
+    for parsed, parsed_table in ((global_opts, global_table), (command_opts, table)):
+        for opt, value in parsed:
+            dest, default = parsed_table[opt[2:]]
+            values[dest] = True if isinstance(default, bool) else value
+    if any(values[dest] is None for dest, _ in table.values()):
+        return None
+    return SimpleNamespace(**values)
+
+
+def _add_options(parser: argparse.ArgumentParser, options: Sequence[Tuple[str, object, str]]) -> None:
+    for name, default, help_text in options:
+        flag = f"--{name}"
+        if isinstance(default, bool):
+            parser.add_argument(flag, action="store_true", help=help_text)
+        elif default is None:
+            parser.add_argument(flag, required=True, help=help_text)
+        else:
+            parser.add_argument(flag, default=default, help=help_text)
+
+
 def build_parser() -> argparse.ArgumentParser:
+    import argparse
+
     parser = argparse.ArgumentParser(description="Manage Obsidian vault registry.")
-    parser.add_argument("--skill-root", default=Path(__file__).resolve().parents[1], help="Path to the skill root")
-    parser.add_argument("--skill-name", default="", help="Override skill name")
-    parser.add_argument("--data-root", default="", help="Override data root")
-    parser.add_argument("--project-root", default="", help="Override project root")
+    _add_options(parser, _GLOBAL_OPTIONS)
 
     subparsers = parser.add_subparsers(dest="command", required=True)
-
-    list_parser = subparsers.add_parser("list", help="List registered vaults")
-    list_parser.add_argument("--json", action="store_true", help="Output JSON")
-    list_parser.set_defaults(func=cmd_list)
-
-    add_parser = subparsers.add_parser("add", help="Add a vault to the registry")
-    add_parser.add_argument("--name", default="", help="Vault name")
-    add_parser.add_argument("--path", required=True, help="Vault path")
-    add_parser.add_argument(
-        "--workdir",
-        default="",
-        help="Default working folder within the vault (relative path; empty for vault root)",
-    )
-    add_parser.add_argument(
-        "--allow-missing-workdir",
-        action="store_true",
-        help="Allow setting workdir even if the folder does not exist",
-    )
-    add_parser.add_argument("--source", default="", help="Source label")
-    add_parser.add_argument("--force", action="store_true", help="Overwrite existing name")
-    add_parser.add_argument("--allow-missing", action="store_true", help="Skip .obsidian check")
-    add_parser.add_argument("--set-active", action="store_true", help="Set this vault as active")
-    add_parser.set_defaults(func=cmd_add)
-
-    remove_parser = subparsers.add_parser("remove", help="Remove a vault from the registry")
-    remove_parser.add_argument("--name", required=True, help="Vault name")
-    remove_parser.set_defaults(func=cmd_remove)
-
-    active_parser = subparsers.add_parser("active", help="Show active vault")
-    active_parser.add_argument("--json", action="store_true", help="Output JSON")
-    active_parser.set_defaults(func=cmd_active)
-
-    set_active_parser = subparsers.add_parser("set-active", help="Set active vault")
-    set_active_parser.add_argument("--name", required=True, help="Vault name")
-    set_active_parser.set_defaults(func=cmd_set_active)
-
-    set_workdir_parser = subparsers.add_parser(
-        "set-workdir",
-        help="Set default working folder for a vault (defaults to active)",
-    )
-    set_workdir_parser.add_argument("--name", default="", help="Vault name (defaults to active)")
-    set_workdir_parser.add_argument(
-        "--workdir",
-        default="",
-        help="Working folder within the vault (relative path; empty for vault root)",
-    )
-    set_workdir_parser.add_argument(
-        "--allow-missing-workdir",
-        action="store_true",
-        help="Allow setting workdir even if the folder does not exist",
-    )
-    set_workdir_parser.set_defaults(func=cmd_set_workdir)
-
-    discover_parser = subparsers.add_parser("discover", help="Discover vaults (Obsidian CLI first)")
-    discover_parser.add_argument("--config", default="", help="Explicit config file path")
-    discover_parser.add_argument("--merge", action="store_true", help="Merge into registry")
-    discover_parser.add_argument("--force", action="store_true", help="Overwrite existing names")
-    discover_parser.add_argument("--json", action="store_true", help="Output JSON when not merging")
-    discover_parser.add_argument("--cli-binary", default="", help="Obsidian CLI binary/path")
-    discover_parser.set_defaults(func=cmd_discover)
-
-    obsidian_parser = subparsers.add_parser("obsidian", help="Run Obsidian CLI commands")
-    obsidian_parser.add_argument("--cli-binary", default="", help="Obsidian CLI binary/path")
-    obsidian_parser.add_argument("--vault", default="", help="Target vault name")
-    obsidian_parser.add_argument("--raw", action="store_true", help="Output raw command output")
-    obsidian_parser.add_argument("--force-delete", action="store_true", help="Allow destructive commands")
-    obsidian_parser.add_argument("command", nargs=argparse.REMAINDER, help="Raw obsidian command tokens")
-    obsidian_parser.set_defaults(func=cmd_obsidian)
+    for name, (handler, help_text, options, command_help) in _SUBCOMMANDS.items():
+        subparser = subparsers.add_parser(name, help=help_text)
+        _add_options(subparser, options)
+        if command_help is not None:
+            subparser.add_argument("command", nargs=argparse.REMAINDER, help=command_help)
+        subparser.set_defaults(func=handler)
 
     return parser
 
 
 def main() -> int:
-    parser = build_parser()
-    args = parser.parse_args()
+    args = _fast_parse_args(sys.argv[1:])
+    if args is None:
+        args = build_parser().parse_args()
     return args.func(args)
 
 